@@ -3,7 +3,7 @@ from pathlib import Path
 
 import cocotb
 from cocotb.clock import Clock
-from cocotb.triggers import RisingEdge, FallingEdge, ReadOnly
+from cocotb.triggers import ClockCycles, RisingEdge, FallingEdge, ReadOnly
 from cocotb_tools.runner import get_runner
 
 
@@ -24,8 +24,7 @@ class ControllerTester:
     
     async def wait_cycles(self, num_cycles: int):
         """Wait for specified number of clock cycles."""
-        for _ in range(num_cycles):
-            await RisingEdge(self.clk)
+        await ClockCycles(self.clk, num_cycles)
         
     async def check_outputs(self, idx_out, write_out, select_out, delete_out=0):
         """Check outputs against expected values."""
@@ -81,20 +80,22 @@ def test_controller_runner():
 
     runner = get_runner(sim)
 
+    waves = os.getenv("WAVES", "0") == "1"
+
     #parameters = {}
 
     runner.build(
         sources=sources,
         hdl_toplevel="controller",
         always=True, 
-        waves=True,
+        waves=waves,
         timescale=("1ns", "1ps")
     )
 
     runner.test(
         hdl_toplevel="controller", 
         test_module="test_controller",
-        waves=True
+        waves=waves
     )
 
 if __name__ == "__main__":
@@ -1,22 +1,16 @@
 import os
 from pathlib import Path
 
-from enum import Enum
-
 import cocotb
 from cocotb.clock import Clock
-from cocotb.triggers import RisingEdge, FallingEdge
+from cocotb.triggers import ClockCycles, RisingEdge, FallingEdge
 from cocotb_tools.runner import get_runner
 from cocotb.triggers import ReadOnly
 
-del_fsm_states = Enum(
-    "del_fsm_states",
-    [
-        ("DEL_ST_START", 0),
-        ("DEL_ST_DELETE", 1),
-        ("DEL_ST_ERROR", 2)
-    ]
-)
+# Zustände der del_fsm (siehe ctrl_types_pkg.sv)
+DEL_ST_START = 0
+DEL_ST_DELETE = 1
+DEL_ST_ERROR = 2
 
 
 class DelFsmTester:
@@ -80,8 +74,7 @@ class DelFsmTester:
 
     async def wait_cycles(self, num_cycles: int):
         """Wait for specified number of clock cycles."""
-        for _ in range(num_cycles):
-            await RisingEdge(self.clk)
+        await ClockCycles(self.clk, num_cycles)
 
     async def set_enabled(self, enabled: bool):
         """Set the enabled signal."""
@@ -129,7 +122,7 @@ async def test_state_is_always_start_when_block_not_enabled(dut):
     for _ in range(5):
         await RisingEdge(dut.clk)
         await ReadOnly()
-        assert tester.state == del_fsm_states.DEL_ST_START.value, "FSM should remain in DEL_ST_START state when not enabled"
+        assert tester.state == DEL_ST_START, "FSM should remain in DEL_ST_START state when not enabled"
         await tester.check_output_signals_are_resetted()
 
     dut._log.info("✓ Test 0 passed: FSM remains in start state when not enabled")
@@ -150,7 +143,7 @@ async def test_reset_from_every_state(dut):
 
     await ReadOnly()
 
-    assert tester.state == del_fsm_states.DEL_ST_START.value, "FSM should be in DEL_ST_START state after reset"
+    assert tester.state == DEL_ST_START, "FSM should be in DEL_ST_START state after reset"
 
     # Check that all outputs are reset to default values
     await tester.check_output_signals_are_resetted()
@@ -169,7 +162,7 @@ async def test_delete_hit_path(dut):
 
     await tester.reset()
 
-    assert tester.state == del_fsm_states.DEL_ST_START.value, "FSM should be in DEL_ST_START state after reset"
+    assert tester.state == DEL_ST_START, "FSM should be in DEL_ST_START state after reset"
 
     # Enter the FSM and enable it
     dut.en.value = 1
@@ -178,7 +171,7 @@ async def test_delete_hit_path(dut):
     await RisingEdge(dut.clk)
 
     # After enabling sub state switch to DEL_ST_START
-    assert tester.state == del_fsm_states.DEL_ST_START.value, "FSM should be in START state after entering"
+    assert tester.state == DEL_ST_START, "FSM should be in START state after entering"
     await tester.check_output_signals_are_resetted()
 
     # wait for memory block to process hit and transition to DELETE
@@ -200,7 +193,7 @@ async def test_delete_hit_path(dut):
     await RisingEdge(dut.clk)
     await ReadOnly()
 
-    assert tester.state == del_fsm_states.DEL_ST_DELETE.value, "FSM should still be in DELETE state after entering"
+    assert tester.state == DEL_ST_DELETE, "FSM should still be in DELETE state after entering"
     assert tester.delete_out.value == 1, "delete_out should be 1 in DELETE state"
     assert tester.idx_out.value == 0b0010, "idx_out should reflect idx_in in DELETE state"
 
@@ -214,7 +207,7 @@ async def test_delete_hit_path(dut):
     await RisingEdge(dut.clk)
     await ReadOnly()
 
-    assert tester.state == del_fsm_states.DEL_ST_START.value, "FSM should be in START state after delete is processed"
+    assert tester.state == DEL_ST_START, "FSM should be in START state after delete is processed"
     await tester.check_output_signals_are_resetted()
 
     dut._log.info("✓ Test 2 passed: Delete with hit transitions correctly through all states")
@@ -231,7 +224,7 @@ async def test_delete_miss_path(dut):
 
     await tester.reset()
 
-    assert tester.state == del_fsm_states.DEL_ST_START.value, "FSM should be in DEL_ST_START state after reset"
+    assert tester.state == DEL_ST_START, "FSM should be in DEL_ST_START state after reset"
 
     # Enter the FSM and enable it
     dut.en.value = 1
@@ -241,7 +234,7 @@ async def test_delete_miss_path(dut):
     await ReadOnly()
 
     # After enabling sub state switch to DEL_ST_START
-    assert tester.state == del_fsm_states.DEL_ST_START.value, "FSM should be in START state after entering"
+    assert tester.state == DEL_ST_START, "FSM should be in START state after entering"
     await tester.check_output_signals_are_resetted()
 
     # wait for memory block to process hit and transition to DELETE
@@ -263,7 +256,7 @@ async def test_delete_miss_path(dut):
     await RisingEdge(dut.clk)
     await ReadOnly()
 
-    assert tester.state == del_fsm_states.DEL_ST_ERROR.value, "FSM should be in ERROR state after miss"
+    assert tester.state == DEL_ST_ERROR, "FSM should be in ERROR state after miss"
     assert tester.delete_out.value == 0, "delete_out should be 0 in ERROR state"
     assert tester.idx_out.value == 0b0000, "idx_out should be 0 in ERROR state"
 
@@ -277,7 +270,7 @@ async def test_delete_miss_path(dut):
     await RisingEdge(dut.clk)
     await ReadOnly()
 
-    assert tester.state == del_fsm_states.DEL_ST_START.value, "FSM should be in START state after delete is processed"
+    assert tester.state == DEL_ST_START, "FSM should be in START state after delete is processed"
     await tester.check_output_signals_are_resetted()
 
 
@@ -297,25 +290,25 @@ async def test_outputs_per_state(dut):
 
     await FallingEdge(dut.clk)
 
-    dut.state.value = del_fsm_states.DEL_ST_START.value    
+    dut.state.value = DEL_ST_START    
     await ReadOnly()
 
     assert tester.delete_out.value == 0, "delete_out should be 0 in START state"
     assert tester.idx_out.value == 0, "idx_out should be 0 in START state"
     assert tester.cmd_done.value == 0, "cmd.done should be 0 in START state"
     assert tester.cmd_error.value == 0, "cmd.error should be 0 in START state"
-    assert tester.next_state == del_fsm_states.DEL_ST_START.value, "next_state should be START when in START state"
+    assert tester.next_state == DEL_ST_START, "next_state should be START when in START state"
 
     await FallingEdge(dut.clk)
     
     # init the next state for checking    
     dut.en.value = 1
-    dut.state.value = del_fsm_states.DEL_ST_START.value
+    dut.state.value = DEL_ST_START
     dut.idx_in.value = 0b0100  # one-hot index for cell 2
     dut.hit.value = 1
     
     await ReadOnly()
-    assert tester.next_state == del_fsm_states.DEL_ST_DELETE.value, "next_state should be DELETE when hit is detected"
+    assert tester.next_state == DEL_ST_DELETE, "next_state should be DELETE when hit is detected"
 
     await RisingEdge(dut.clk)
     await ReadOnly()
@@ -324,17 +317,17 @@ async def test_outputs_per_state(dut):
     assert tester.idx_out.value == 0b0100, "idx_out should reflect idx_in in DELETE state"
     assert tester.cmd_done.value == 1, "cmd.done should be 1 in DELETE state"
     assert tester.cmd_error.value == 0, "cmd.error should be 0 in DELETE state"
-    assert tester.next_state == del_fsm_states.DEL_ST_START.value, "next_state should be START after DELETE state"
+    assert tester.next_state == DEL_ST_START, "next_state should be START after DELETE state"
 
 
     await FallingEdge(dut.clk)
-    dut.state.value = del_fsm_states.DEL_ST_START.value
+    dut.state.value = DEL_ST_START
     dut.hit.value = 0
 
     await RisingEdge(dut.clk)
     await ReadOnly()
-    assert tester.state == del_fsm_states.DEL_ST_ERROR.value, "FSM should be in ERROR state after processing delete without hit"
-    assert tester.next_state == del_fsm_states.DEL_ST_START.value, "next_state should be START when no hit is detected"
+    assert tester.state == DEL_ST_ERROR, "FSM should be in ERROR state after processing delete without hit"
+    assert tester.next_state == DEL_ST_START, "next_state should be START when no hit is detected"
     assert tester.delete_out.value == 0, "delete_out should be 0 in ERROR state"
     assert tester.idx_out.value == 0b0000, "idx_out should be 0 in ERROR state"
     assert tester.cmd_done.value == 0, "cmd.done should be 0 in ERROR state"
@@ -343,10 +336,10 @@ async def test_outputs_per_state(dut):
     await RisingEdge(dut.clk)
     await ReadOnly()
 
-    assert tester.state == del_fsm_states.DEL_ST_START.value, "FSM should be in START state after no hit"
+    assert tester.state == DEL_ST_START, "FSM should be in START state after no hit"
     assert tester.cmd_done.value == 0, "cmd.done should be 0 in START state"
     assert tester.cmd_error.value == 0, "cmd.error should be 0 in START state"
-    assert tester.next_state == del_fsm_states.DEL_ST_ERROR.value, "next_state should be ERROR after START state (enter is still set)"
+    assert tester.next_state == DEL_ST_ERROR, "next_state should be ERROR after START state (enter is still set)"
     assert tester.delete_out.value == 0, "delete_out should be 0 in START state"
     assert tester.idx_out.value == 0b0000, "idx_out should be 0 in START state"
    
@@ -382,10 +375,10 @@ async def test_sequential_deletes(dut):
         await ReadOnly()
         
         ## Start state after entering the FSM
-        assert tester.state == del_fsm_states.DEL_ST_START.value, "FSM should be in START state after entering"
+        assert tester.state == DEL_ST_START, "FSM should be in START state after entering"
         await tester.check_output_signals_are_resetted(), "Outputs should be reset in START state after entering"
         
-        assert tester.next_state == (del_fsm_states.DEL_ST_DELETE.value if hit else del_fsm_states.DEL_ST_ERROR.value), \
+        assert tester.next_state == (DEL_ST_DELETE if hit else DEL_ST_ERROR), \
             f"Next state should be {'DELETE' if hit else 'ERROR'} when hit is {'detected' if hit else 'not detected'}"
 
         await FallingEdge(dut.clk)
@@ -394,10 +387,10 @@ async def test_sequential_deletes(dut):
         await RisingEdge(dut.clk)
         await ReadOnly()
 
-        assert tester.state == (del_fsm_states.DEL_ST_DELETE.value if hit else del_fsm_states.DEL_ST_ERROR.value), \
+        assert tester.state == (DEL_ST_DELETE if hit else DEL_ST_ERROR), \
             f"FSM should be in {'DELETE' if hit else 'ERROR'} state after processing hit={hit}"
 
-        assert tester.next_state == del_fsm_states.DEL_ST_START.value, "FSM should be in DEL_ST_START after processing delete or error"
+        assert tester.next_state == DEL_ST_START, "FSM should be in DEL_ST_START after processing delete or error"
         assert tester.cmd_done.value == (1 if hit else 0), f"cmd.done should be {'1' if hit else '0'} in {'DELETE' if hit else 'ERROR'} state"
         assert tester.cmd_error.value == (0 if hit else 1), f"cmd.error should be {'0' if hit else '1'} in {'DELETE' if hit else 'ERROR'} state"
 
@@ -443,7 +436,7 @@ async def test_en_deassert_mid_operation(dut):
     await RisingEdge(dut.clk)
     
     
-    assert tester.state == del_fsm_states.DEL_ST_START.value, "FSM should be in START state after entering"
+    assert tester.state == DEL_ST_START, "FSM should be in START state after entering"
     await tester.check_output_signals_are_resetted(), "Outputs should be reset in START state after entering"
 
     dut.hit.value = 1
@@ -454,7 +447,7 @@ async def test_en_deassert_mid_operation(dut):
 
     await RisingEdge(dut.clk)  # Now in DEL_ST_DELETE
     
-    assert tester.state == del_fsm_states.DEL_ST_START.value, "FSM should be in START state after reset of mid-operation"
+    assert tester.state == DEL_ST_START, "FSM should be in START state after reset of mid-operation"
 
     await FallingEdge(dut.clk)
 
@@ -471,7 +464,7 @@ async def test_en_deassert_mid_operation(dut):
     dut.en.value = 0  # Deassert enable mid-operation
     await RisingEdge(dut.clk)
 
-    assert tester.state == del_fsm_states.DEL_ST_START.value, "FSM should remain in START state when en is deasserted mid-operation"
+    assert tester.state == DEL_ST_START, "FSM should remain in START state when en is deasserted mid-operation"
     await tester.check_output_signals_are_resetted(), "Outputs should be reset to default values when en is deasserted mid-operation"
 
     dut._log.info("✓ Test 7 passed: en deassert freezes FSM, enter mid-op resets to START")
@@ -489,7 +482,7 @@ async def test_output_signals_each_state(dut):
     await tester.reset()
 
     # -- START state after reset: all outputs idle --
-    assert tester.state == del_fsm_states.DEL_ST_START.value, "FSM should be in START after reset"
+    assert tester.state == DEL_ST_START, "FSM should be in START after reset"
     await tester.check_output_signals_are_resetted()
 
     # Enter the FSM and enable it
@@ -499,7 +492,7 @@ async def test_output_signals_each_state(dut):
     await RisingEdge(dut.clk)
 
     # Still in START (enter forces START on posedge)
-    assert tester.state == del_fsm_states.DEL_ST_START.value, "FSM should be in START after entering"
+    assert tester.state == DEL_ST_START, "FSM should be in START after entering"
     await tester.check_output_signals_are_resetted()
 
     await FallingEdge(dut.clk)
@@ -512,7 +505,7 @@ async def test_output_signals_each_state(dut):
     await RisingEdge(dut.clk)
     await ReadOnly()
 
-    assert tester.state == del_fsm_states.DEL_ST_DELETE.value, "FSM should be in DELETE state"
+    assert tester.state == DEL_ST_DELETE, "FSM should be in DELETE state"
     assert tester.delete_out.value == 1, "delete_out should be 1 in DELETE"
     assert tester.idx_out.value == 0b0010, "idx_out should match idx_in in DELETE"
     assert tester.cmd_done.value == 1, "cmd.done should be 1 in DELETE"
@@ -522,7 +515,7 @@ async def test_output_signals_each_state(dut):
     await RisingEdge(dut.clk)
     await ReadOnly()
 
-    assert tester.state == del_fsm_states.DEL_ST_START.value, "FSM should return to START after DELETE"
+    assert tester.state == DEL_ST_START, "FSM should return to START after DELETE"
     assert tester.delete_out.value == 0, "delete_out should be 0 in START"
     assert tester.idx_out.value == 0, "idx_out should be 0 in START"
     assert tester.cmd_done.value == 0, "cmd.done should be 0 in START"
@@ -565,14 +558,14 @@ async def test_delete_out_single_cycle(dut):
     await RisingEdge(dut.clk)
     await ReadOnly()
 
-    assert tester.state == del_fsm_states.DEL_ST_DELETE.value, "FSM should be in DELETE"
+    assert tester.state == DEL_ST_DELETE, "FSM should be in DELETE"
     assert tester.delete_out.value == 1, "delete_out should be 1 in DELETE state"
 
     # -- Back to START: delete_out must be deasserted --
     await RisingEdge(dut.clk)
     await ReadOnly()
 
-    assert tester.state == del_fsm_states.DEL_ST_START.value, "FSM should return to START"
+    assert tester.state == DEL_ST_START, "FSM should return to START"
     assert tester.delete_out.value == 0, "delete_out should be 0 after returning to START"
 
     # Wait additional cycles to ensure it stays deasserted
@@ -615,7 +608,7 @@ async def test_idx_out_on_hit(dut):
         await RisingEdge(dut.clk)
         await ReadOnly()
 
-        assert tester.state == del_fsm_states.DEL_ST_DELETE.value, "FSM should be in DELETE"
+        assert tester.state == DEL_ST_DELETE, "FSM should be in DELETE"
         assert tester.idx_out.value == idx_val, \
             f"idx_out ({tester.idx_out.value:#06b}) should match idx_in ({idx_val:#06b}) in DELETE"
 
@@ -623,7 +616,7 @@ async def test_idx_out_on_hit(dut):
         await RisingEdge(dut.clk)
         await ReadOnly()
 
-        assert tester.state == del_fsm_states.DEL_ST_START.value, "FSM should return to START"
+        assert tester.state == DEL_ST_START, "FSM should return to START"
         assert tester.idx_out.value == 0, "idx_out should be 0 after returning to START"
 
     dut._log.info("✓ Test 11 passed: idx_out matches idx_in on hit and resets to 0")
@@ -656,7 +649,7 @@ async def test_idx_out_zero_on_miss(dut):
     await RisingEdge(dut.clk)
     await ReadOnly()
 
-    assert tester.state == del_fsm_states.DEL_ST_ERROR.value, "FSM should be in ERROR on miss"
+    assert tester.state == DEL_ST_ERROR, "FSM should be in ERROR on miss"
     assert tester.idx_out.value == 0, "idx_out should be 0 in ERROR state"
     assert tester.delete_out.value == 0, "delete_out should be 0 in ERROR state"
     assert tester.cmd_error.value == 1, "cmd.error should be 1 in ERROR state"
@@ -666,7 +659,7 @@ async def test_idx_out_zero_on_miss(dut):
     await RisingEdge(dut.clk)
     await ReadOnly()
 
-    assert tester.state == del_fsm_states.DEL_ST_START.value, "FSM should return to START"
+    assert tester.state == DEL_ST_START, "FSM should return to START"
     assert tester.idx_out.value == 0, "idx_out should be 0 after ERROR"
 
     dut._log.info("✓ Test 11a passed: idx_out is 0 on miss, no invalid index propagation")
@@ -698,14 +691,14 @@ async def test_idx_out_cleared_after_operation(dut):
     await RisingEdge(dut.clk)
     await ReadOnly()
 
-    assert tester.state == del_fsm_states.DEL_ST_DELETE.value, "FSM should be in DELETE"
+    assert tester.state == DEL_ST_DELETE, "FSM should be in DELETE"
     assert tester.idx_out.value == 0b1000, "idx_out should be set in DELETE"
 
     # Transition back to START
     await RisingEdge(dut.clk)
     await ReadOnly()
 
-    assert tester.state == del_fsm_states.DEL_ST_START.value, "FSM should return to START"
+    assert tester.state == DEL_ST_START, "FSM should return to START"
     assert tester.idx_out.value == 0, "idx_out should be cleared after DELETE completes"
 
     # -- Miss path: idx_out should remain 0 in ERROR despite non-zero idx_in --
@@ -723,14 +716,14 @@ async def test_idx_out_cleared_after_operation(dut):
     await RisingEdge(dut.clk)
     await ReadOnly()
 
-    assert tester.state == del_fsm_states.DEL_ST_ERROR.value, "FSM should be in ERROR"
+    assert tester.state == DEL_ST_ERROR, "FSM should be in ERROR"
     assert tester.idx_out.value == 0, "idx_out should be 0 in ERROR even with non-zero idx_in"
 
     # Transition back to START
     await RisingEdge(dut.clk)
     await ReadOnly()
 
-    assert tester.state == del_fsm_states.DEL_ST_START.value, "FSM should return to START"
+    assert tester.state == DEL_ST_START, "FSM should return to START"
     assert tester.idx_out.value == 0, "idx_out should remain 0 after ERROR"
 
     dut._log.info("✓ Test 11c passed: idx_out cleared after operations complete")
@@ -766,7 +759,7 @@ async def test_cmd_done_and_error_signals(dut):
     await RisingEdge(dut.clk)
     await ReadOnly()
 
-    assert tester.state == del_fsm_states.DEL_ST_DELETE.value, "FSM should be in DELETE"
+    assert tester.state == DEL_ST_DELETE, "FSM should be in DELETE"
     assert tester.cmd_done.value == 1, "cmd.done should be 1 in DELETE"
     assert tester.cmd_error.value == 0, "cmd.error should be 0 in DELETE"
 
@@ -774,7 +767,7 @@ async def test_cmd_done_and_error_signals(dut):
     await RisingEdge(dut.clk)
     await ReadOnly()
 
-    assert tester.state == del_fsm_states.DEL_ST_START.value, "FSM should return to START"
+    assert tester.state == DEL_ST_START, "FSM should return to START"
     assert tester.cmd_done.value == 0, "cmd.done should be 0 in START after DELETE"
     assert tester.cmd_error.value == 0, "cmd.error should be 0 in START after DELETE"
 
@@ -792,7 +785,7 @@ async def test_cmd_done_and_error_signals(dut):
     await RisingEdge(dut.clk)
     await ReadOnly()
 
-    assert tester.state == del_fsm_states.DEL_ST_ERROR.value, "FSM should be in ERROR"
+    assert tester.state == DEL_ST_ERROR, "FSM should be in ERROR"
     assert tester.cmd_done.value == 0, "cmd.done should be 0 in ERROR"
     assert tester.cmd_error.value == 1, "cmd.error should be 1 in ERROR"
 
@@ -800,7 +793,7 @@ async def test_cmd_done_and_error_signals(dut):
     await RisingEdge(dut.clk)
     await ReadOnly()
 
-    assert tester.state == del_fsm_states.DEL_ST_START.value, "FSM should return to START"
+    assert tester.state == DEL_ST_START, "FSM should return to START"
     assert tester.cmd_done.value == 0, "cmd.done should be 0 in START after ERROR"
     assert tester.cmd_error.value == 0, "cmd.error should be 0 in START after ERROR"
 
@@ -824,7 +817,7 @@ async def test_enter_mid_operation_resets(dut):
 
     await RisingEdge(dut.clk)
 
-    assert tester.state == del_fsm_states.DEL_ST_START.value, "FSM should be in START after entering"
+    assert tester.state == DEL_ST_START, "FSM should be in START after entering"
 
     dut.hit.value = 1
     dut.idx_in.value = 0b0001
@@ -834,7 +827,7 @@ async def test_enter_mid_operation_resets(dut):
     await RisingEdge(dut.clk)
     await ReadOnly()
 
-    assert tester.state == del_fsm_states.DEL_ST_DELETE.value, "FSM should be in DELETE"
+    assert tester.state == DEL_ST_DELETE, "FSM should be in DELETE"
 
     # Assert enter mid-operation to force reset to START
     await FallingEdge(dut.clk)
@@ -844,7 +837,7 @@ async def test_enter_mid_operation_resets(dut):
     await ReadOnly()
 
     # FSM should be forced back to START
-    assert tester.state == del_fsm_states.DEL_ST_START.value, \
+    assert tester.state == DEL_ST_START, \
         "FSM should reset to START when enter is asserted mid-operation"
     await tester.check_output_signals_are_resetted()
 
@@ -856,7 +849,7 @@ async def test_enter_mid_operation_resets(dut):
     await RisingEdge(dut.clk)
     await ReadOnly()
 
-    assert tester.state == del_fsm_states.DEL_ST_ERROR.value, "FSM should be in ERROR"
+    assert tester.state == DEL_ST_ERROR, "FSM should be in ERROR"
 
     # Assert enter mid-error
     await FallingEdge(dut.clk)
@@ -865,7 +858,7 @@ async def test_enter_mid_operation_resets(dut):
     await RisingEdge(dut.clk)
     await ReadOnly()
 
-    assert tester.state == del_fsm_states.DEL_ST_START.value, \
+    assert tester.state == DEL_ST_START, \
         "FSM should reset to START when enter is asserted during ERROR"
     await tester.check_output_signals_are_resetted()
 
@@ -886,6 +879,8 @@ def test_del_fsm_runner():
 
     runner = get_runner(sim)
 
+    waves = os.getenv("WAVES", "0") == "1"
+
     parameters = {
         "NUM_ENTRIES": 4
     }
@@ -894,14 +889,14 @@ def test_del_fsm_runner():
         sources=sources,
         hdl_toplevel="del_fsm",
         always=True, 
-        waves=True,
+        waves=waves,
         timescale=("1ns", "1ps")
     )
 
     runner.test(
         hdl_toplevel="del_fsm", 
         test_module="test_del_fsm",
-        waves=True
+        waves=waves
     )
 
 if __name__ == "__main__":
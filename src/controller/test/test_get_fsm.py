@@ -74,20 +74,22 @@ def test_get_fsm_runner():
 
     runner = get_runner(sim)
 
+    waves = os.getenv("WAVES", "0") == "1"
+
     #parameters = {}
 
     runner.build(
         sources=sources,
         hdl_toplevel="get_fsm",
         always=True, 
-        waves=True,
+        waves=waves,
         timescale=("1ns", "1ps")
     )
 
     runner.test(
         hdl_toplevel="get_fsm", 
         test_module="test_get_fsm",
-        waves=True
+        waves=waves
     )
 
 if __name__ == "__main__":
@@ -3,7 +3,7 @@ from pathlib import Path
 
 import cocotb
 from cocotb.clock import Clock
-from cocotb.triggers import RisingEdge, FallingEdge
+from cocotb.triggers import ClockCycles, RisingEdge, FallingEdge
 from cocotb_tools.runner import get_runner
 from cocotb.triggers import ReadOnly
 
@@ -25,8 +25,7 @@ class UpsertTester:
     
     async def wait_cycles(self, num_cycles: int):
         """Wait for specified number of clock cycles."""
-        for _ in range(num_cycles):
-            await RisingEdge(self.clk)
+        await ClockCycles(self.clk, num_cycles)
     
     async def check_outputs(self, idx_out, write_out, select_out):
         """Check outputs against expected values."""
@@ -154,20 +153,22 @@ def test_upsert_runner():
 
     runner = get_runner(sim)
 
+    waves = os.getenv("WAVES", "0") == "1"
+
     #parameters = {}
 
     runner.build(
         sources=sources,
         hdl_toplevel="upsert_fsm",
         always=True, 
-        waves=True,
+        waves=waves,
         timescale=("1ns", "1ps")
     )
 
     runner.test(
         hdl_toplevel="upsert_fsm", 
         test_module="test_upsert_fsm",
-        waves=True
+        waves=waves
     )
 
 if __name__ == "__main__":
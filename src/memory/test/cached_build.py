@@ -0,0 +1,54 @@
+"""
+Gemeinsamer Build-Helfer für die cocotb-Runner der Memory-Tests.
+"""
+
+import fcntl
+import hashlib
+import os
+import shutil
+import uuid
+from pathlib import Path
+
+from cocotb_tools.runner import get_runner
+
+
+def build_once(sim, build_root, name, sources, parameters, build_args, waves, **build_kwargs):
+    """Baut das Modell höchstens einmal pro Quellstand und liefert (runner, build_dir).
+
+    Simulator, Parameter, Flags und WAVES stecken im Namen des Build-Verzeichnisses,
+    der Hash der Quellen im Stempel .built. Die Datei-Sperre lässt parallele
+    pytest -n Worker auf denselben Build warten, statt ihn erneut zu bauen.
+    """
+    runner = get_runner(sim)
+
+    config_hash = hashlib.sha1(repr((sim, sorted(parameters.items()), build_args, waves)).encode()).hexdigest()[:8]
+    build_dir = Path(build_root) / f"{name}_{config_hash}"
+    build_dir.parent.mkdir(parents=True, exist_ok=True)
+    rebuild = os.getenv("REBUILD", "0") == "1"
+
+    # Bei REBUILD=1 zusätzlich die Lauf-ID, damit alle Worker eines Laufs denselben frischen Build verwenden
+    build_hash = hashlib.sha1(b"".join(Path(src).read_bytes() for src in sources)).hexdigest()
+    if rebuild:
+        build_hash += os.getenv("PYTEST_XDIST_TESTRUNUID", uuid.uuid4().hex)
+    stamp = build_dir / ".built"
+
+    # Sperrdatei neben dem Build-Verzeichnis, damit REBUILD=1 sie nicht mitlöscht
+    with open(build_dir.with_suffix(".lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        if stamp.exists() and stamp.read_text() == build_hash:
+            return runner, build_dir
+        if rebuild:
+            # Verilator ignoriert always=, daher den alten Build komplett verwerfen
+            shutil.rmtree(build_dir, ignore_errors=True)
+        runner.build(
+            sources=sources,
+            parameters=parameters,
+            build_args=build_args,
+            build_dir=build_dir,
+            always=True,
+            waves=waves,
+            **build_kwargs,
+        )
+        stamp.write_text(build_hash)
+
+    return runner, build_dir
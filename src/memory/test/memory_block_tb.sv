@@ -0,0 +1,58 @@
+/**
+ * Memory Block Testbench Wrapper
+ *
+ * Thin top level for the cocotb tests of memory_block.
+ * Generates the clock in HDL (10 ns period) so cocotb only has to
+ * await the edges instead of toggling clk from Python.
+ */
+
+module memory_block_tb #(
+    parameter int unsigned NUM_ENTRIES = cache_cfg_pkg::NUM_ENTRIES,
+    parameter int unsigned KEY_WIDTH = cache_cfg_pkg::KEY_WIDTH,
+    parameter int unsigned VALUE_WIDTH = cache_cfg_pkg::VALUE_WIDTH
+)(
+    input logic rst_n,
+
+    // Control signals
+    input logic write_in,
+    input logic select_by_index,
+    input logic delete_in,
+
+    // Data line input
+    input logic [KEY_WIDTH-1:0] key_in,
+    input logic [VALUE_WIDTH-1:0] value_in,
+    input logic [NUM_ENTRIES-1:0] index_in,
+
+    // Data line output
+    output logic [VALUE_WIDTH-1:0] value_out,
+    output logic [NUM_ENTRIES-1:0] index_out,
+    output logic hit,
+    output logic [NUM_ENTRIES-1:0] used_entries
+);
+
+    logic clk = 1'b0;
+    always #5 clk = ~clk;
+
+    memory_block #(
+        .NUM_ENTRIES(NUM_ENTRIES),
+        .KEY_WIDTH(KEY_WIDTH),
+        .VALUE_WIDTH(VALUE_WIDTH)
+    ) u_dut (
+        .clk(clk),
+        .rst_n(rst_n),
+
+        .write_in(write_in),
+        .select_by_index(select_by_index),
+        .delete_in(delete_in),
+
+        .key_in(key_in),
+        .value_in(value_in),
+        .index_in(index_in),
+
+        .value_out(value_out),
+        .index_out(index_out),
+        .hit(hit),
+        .used_entries(used_entries)
+    );
+
+endmodule
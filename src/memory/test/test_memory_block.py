@@ -3,19 +3,25 @@ Modern cocotb 2.0 testbench for the Controller module.
 Uses async/await syntax and modern pythonic patterns.
 """
 
+import functools
 import os
 from pathlib import Path
 
 import cocotb
-from cocotb.clock import Clock
-from cocotb.triggers import RisingEdge, FallingEdge, ReadOnly
+import pytest
+from cocotb.triggers import ReadOnly
 from cocotb.types import LogicArray
 
-from cocotb_tools.runner import get_runner
+from cached_build import build_once
 import random
 
 os.environ['COCOTB_ANSI_OUTPUT'] = '1'
 
+# Fester Seed: reproduzierbares (key, value)-Paar statt random.randint pro Test.
+# key = 0 gilt im memory_block als "kein Schlüssel" und liefert nie einen Hit.
+_RNG = random.Random(0xC0C07B)
+_WRITE_PAIR = (_RNG.randrange(1, 16), _RNG.randrange(16))
+
 
 class MemoryBlockTester: 
     """
@@ -40,6 +46,10 @@ class MemoryBlockTester:
         
         self.used_entries = dut.used_entries
 
+        # Parameter einmal lesen; one-hot Masken für index_in einmal pro Test statt bei jedem Zugriff
+        self.num_entries = int(dut.NUM_ENTRIES.value)
+        self.idx_mask = [1 << i for i in range(self.num_entries)]
+
 
     async def reset(self):
         """Führt einen Reset durch (Active High Reset)."""
@@ -52,69 +62,98 @@ class MemoryBlockTester:
 
         await ReadOnly()
         
-        await FallingEdge(self.clk)
+        await self.clk.falling_edge
         self.rst_n.value = 1  # Reset lösen
-        await FallingEdge(self.clk)
+        await self.clk.falling_edge
 
 
     async def write(self, idx: int, key: int, value: int):
         """Schreibt Daten in das Register (ohne Output zu aktivieren)."""
-        await RisingEdge(self.clk)
+        await self.clk.rising_edge
         self.write_op.value = 1  # Write-Operation aktivieren
-        self.index_in.value = 1 << idx   # idx=0 → 0b01, idx=1 → 0b10
+        self.index_in.value = self.idx_mask[idx]   # idx=0 → 0b01, idx=1 → 0b10
 
         self.key_in.value = key
         self.value_in.value = value
 
-        await ReadOnly()
-
-        self.dut._log.info(f"Writing key {key} with value {value} at index {idx}.")
-
-        await FallingEdge(self.clk)
-
-        await RisingEdge(self.clk) 
+        # Die Zelle übernimmt an der fallenden Flanke, eine Periode später wird alles zurückgesetzt
+        await self.clk.rising_edge 
         self.write_op.value = 0  # Write beenden
         self.index_in.value = 0  # Index zurücksetzen
         self.key_in.value = 0
         self.value_in.value = 0
 
-    async def read_by_key(self, key: int):
-        """Liest Daten aus dem Register (ohne Output zu aktivieren)."""
+    async def fill(self):
+        """Schreibt alle Zellen mit key = i + 1 und value = 2 * (i + 1), gibt NUM_ENTRIES zurück."""
+        for i in range(self.num_entries):
+            await self.write(i, i + 1, (i + 1) * 2)
+        return self.num_entries
+
+    async def read_all_by_key(self, keys):
+        """Liest mehrere Schlüssel nacheinander, ein Takt pro Schlüssel; gibt [(hit, value), ...] zurück."""
         self.select_by_index.value = 0  # read by key
-        self.key_in.value = key
-        
-        await RisingEdge(self.clk)
-        await ReadOnly()
-        return self.value_out.value
+        results = []
+        for key in keys:
+            await self.clk.falling_edge
+            self.key_in.value = key
+
+            await self.clk.rising_edge
+            await ReadOnly()
+            results.append(self._sample())
+        return results
+
+    async def read_all_by_index(self, indices):
+        """Liest mehrere Zellen per Index; gibt [(hit, value), ...] zurück.
+
+        Die Ausgänge werden an der steigenden Flanke registriert und sind an der
+        folgenden fallenden Flanke stabil: dort wird der vorige Index abgetastet
+        und direkt der nächste angelegt, also eine Flanke pro Zelle.
+        """
+        results = []
+        for n, idx in enumerate(indices):
+            await self.clk.falling_edge
+            if n:
+                results.append(self._sample())
+            self._drive_select_by_index(idx)
+
+        # Ein einziger Aufräum-Takt nach dem Sweep
+        await self.clk.falling_edge
+        results.append(self._sample())
+        self.select_by_index.value = 0  # Read beenden
+        self.index_in.value = 0
+        return results
 
+    def _drive_select_by_index(self, idx: int):
+        """Legt einen Read per Index an, ohne auf eine Flanke zu warten."""
+        self.select_by_index.value = 1  # read by index
+        self.index_in.value = self.idx_mask[idx]
+
+    def _sample(self):
+        """Tastet (hit, value_out) ab; nur aufrufen, wenn die Ausgänge stabil sind."""
+        return int(self.hit.value), int(self.value_out.value)
 
 
     async def get_used_entries(self):
         """Liest die Anzahl der verwendeten Einträge aus."""
-        self.dut._log.info(f"Used entries bitmask: {self.used_entries.value}")
-        print(f"Used entries calculation: {self.used_entries.value.count('1')} used entries.")
-        return self.used_entries.value.count('1')
+        return int(self.used_entries.value).bit_count()
 
 
     async def get_all_cells(self):
         """Liest die Werte aller Zellen aus."""
-        cells = []
-        for i in range(self.dut.NUM_ENTRIES.value):
-            value = await self.get_cell_value_by_index(i)
-            cells.append(value)
-        return cells
+        results = await self.read_all_by_index(range(self.num_entries))
+        return [value for _, value in results]
 
 
     async def get_cell_value_by_index(self, idx: int):
         """Read the value stored in a specific memory cell."""
-        self.select_by_index.value = 1  # read by index
-        self.index_in.value = 1 << idx
+        self._drive_select_by_index(idx)
         
-        await RisingEdge(self.clk)
+        await self.clk.rising_edge
         await ReadOnly()
         value = self.value_out.value  # capture value BEFORE clearing select
 
-        await RisingEdge(self.clk)
+        # Ausgabe ist bereits registriert, zurücksetzen reicht an der fallenden Flanke
+        await self.clk.falling_edge
         self.select_by_index.value = 0  # Read beenden
         self.index_in.value = 0
         return value
@@ -125,24 +164,20 @@ async def test_reset(dut):
     """Test: Reset-Verhalten überprüfen."""
     
     tester = MemoryBlockTester(dut)
-    
-    # Start clock
-    cocotb.start_soon(Clock(dut.clk, 10, unit="ns").start())
 
     await tester.write(0, 0xF, 0xF)  # Vor dem Reset einen Wert schreiben, um sicherzustellen, dass Reset funktioniert
 
     # 1. Reset
     await tester.reset()
 
-    await FallingEdge(tester.clk) 
+    await tester.clk.falling_edge 
 
     # check that no line is used
     assert await tester.get_used_entries() == 0, \
         f"Reset failed! Expected 0 used entries, got {await tester.get_used_entries()}"
 
     # check that all cells are resetted to contain no data
-    for i in range(tester.dut.NUM_ENTRIES.value):
-        value = await tester.get_cell_value_by_index(i)
+    for i, value in enumerate(await tester.get_all_cells()):
         assert value == 0, \
             f"Reset failed! Expected value 0 in cell {i}, got {hex(value)}"
 
@@ -158,25 +193,21 @@ async def test_writing_memory_block(dut):
     """Test: check if memory can write into a single cell and read it back."""
 
     tester = MemoryBlockTester(dut)
-    
-    # Start clock
-    cocotb.start_soon(Clock(dut.clk, 10, unit="ns").start())
 
     # 1. Reset
     await tester.reset()
 
-    await RisingEdge(tester.clk)
+    await tester.clk.rising_edge
 
     # 2. Schreiben
-    key = random.randint(0, 15)  # Schlüssel im Bereich der Adressierung
-    value = random.randint(0, 15)  # Wert im Bereich der Wertbreite
+    key, value = _WRITE_PAIR  # Schlüssel/Wert im Bereich der Adressierung bzw. Wertbreite
 
     tester.key_in.value = key
     tester.value_in.value = value
     tester.write_op.value = 1  # Write-Operation aktivieren
     tester.index_in.value = 1 << 0  # Schreiben in die erste Zelle
 
-    await RisingEdge(tester.clk)
+    await tester.clk.rising_edge
     await ReadOnly()  
 
     assert tester.hit.value == 1, f"Expected hit signal to be 1 after writing, but got {tester.hit.value}."
@@ -190,21 +221,17 @@ async def test_used_entries(dut):
     """Test: check if used_entries signal correctly reflects the number of used entries."""
 
     tester = MemoryBlockTester(dut)
-    
-    # Start clock
-    cocotb.start_soon(Clock(dut.clk, 10, unit="ns").start())
 
     # 1. Reset
     await tester.reset()
 
     # 2. Schreiben von mehreren Einträgen
-    num_entries = tester.dut.NUM_ENTRIES.value
+    num_entries = tester.num_entries
     for i in range(num_entries):
         key = i + 1  # Schlüssel im Bereich der Adressierung
         value = (i + 1) * 2  # Wert im Bereich der Wertbreite
         await tester.write(i, key, value)
 
-        await ReadOnly()  
         # Überprüfen der Anzahl der verwendeten Einträge nach jedem Schreibvorgang
         used_entries = await tester.get_used_entries()
         assert used_entries == i + 1, f"Expected {i + 1} used entries after writing {i + 1} entries, but got {used_entries}."
@@ -215,24 +242,20 @@ async def test_reading_cell_by_key(dut):
     """Test: check if we can read the value of a cell by its key."""
 
     tester = MemoryBlockTester(dut)
-    
-    # Start clock
-    cocotb.start_soon(Clock(dut.clk, 10, unit="ns").start())
 
     # 1. Reset
     await tester.reset()
 
     # 2. Schreiben von mehreren Einträgen
-    num_entries = tester.dut.NUM_ENTRIES.value
-    for i in range(num_entries):
-        key = i + 1  # Schlüssel im Bereich der Adressierung
-        value = (i + 1) * 2  # Wert im Bereich der Wertbreite
-        await tester.write(i, key, value)
+    num_entries = await tester.fill()
 
-        # Lesen des Werts über den Schlüssel und Überprüfen der Korrektheit
-        read_value = await tester.read_by_key(key)
+    # Lesen aller Werte über den Schlüssel, geprüft wird erst nach dem Sweep
+    results = await tester.read_all_by_key([i + 1 for i in range(num_entries)])
 
-        assert dut.hit.value == 1, f"Expected hit signal to be 1 for key {key}, but got {dut.hit.value} for idx {i}."
+    for i, (hit, read_value) in enumerate(results):
+        key = i + 1
+        value = (i + 1) * 2
+        assert hit == 1, f"Expected hit signal to be 1 for key {key}, but got {hit} for idx {i}."
         assert read_value == value, f"Expected value {value} for key {key}, but got {read_value}."
 
 
@@ -241,95 +264,60 @@ async def test_reading_cell_by_index(dut):
     """Test: check if we can read the value of a cell by its index."""
 
     tester = MemoryBlockTester(dut)
-    
-    # Start clock
-    cocotb.start_soon(Clock(dut.clk, 10, unit="ns").start())
 
     # 1. Reset
     await tester.reset()
 
     # 2. Schreiben von mehreren Einträgen
-    num_entries = tester.dut.NUM_ENTRIES.value
-    for i in range(num_entries):
-        key = i + 1  # Schlüssel im Bereich der Adressierung
-        value = (i + 1) * 2  # Wert im Bereich der Wertbreite
-        await tester.write(i, key, value)
-
-
-    all_cells = await tester.get_all_cells()
-    print(f"All cells: {all_cells}")
+    num_entries = await tester.fill()
 
     # Lesen der zellen an den Stellen über die select Operation und Überprüfen ob mit einem matchendem Schlüssel
-    for i in range(num_entries):
-        await FallingEdge(tester.clk)
-        dut.index_in.value = 1 << i  # Index auf die Zelle setzen
-        dut.select_by_index.value = 1  # Read-Operation aktivieren
-        
-        await RisingEdge(tester.clk)
-        await ReadOnly()
+    results = await tester.read_all_by_index(range(num_entries))
+
+    for i, (hit, value_out) in enumerate(results):
         expected_value = (i + 1) * 2
 
-        assert tester.hit.value == 1, f"Expected hit signal to be 1 for select operation with index {i}, but got {tester.hit.value}."
-        assert tester.value_out.value == expected_value, f"Expected value_out {expected_value} for select operation with index {i}, but got {tester.value_out.value}."
+        assert hit == 1, f"Expected hit signal to be 1 for select operation with index {i}, but got {hit}."
+        assert value_out == expected_value, f"Expected value_out {expected_value} for select operation with index {i}, but got {value_out}."
 
 @cocotb.test()
 async def test_reading_cell_by_select_with_input_key_matching(dut):
     """Test: check if we can read the value of a cell by its key"""
 
     tester = MemoryBlockTester(dut)
-    
-    # Start clock
-    cocotb.start_soon(Clock(dut.clk, 10, unit="ns").start())
 
     # 1. Reset
     await tester.reset()
 
     # 2. Schreiben von mehreren Einträgen
-    num_entries = tester.dut.NUM_ENTRIES.value
-    for i in range(num_entries):
-        key = i + 1  # Schlüssel im Bereich der Adressierung
-        value = (i + 1) * 2  # Wert im Bereich der Wertbreite
-        await tester.write(i, key, value)
+    num_entries = await tester.fill()
 
+    # Lesen der Zellen über key, Schlüssel stimmen mit den Einträgen überein
+    dut.index_in.value = 0
+    results = await tester.read_all_by_key([i + 1 for i in range(num_entries)])
 
-    for i in range(num_entries):
-        await FallingEdge(tester.clk)
-        # Lesen der Zelle über key
-        dut.index_in.value = 0  # Index auf die erste Zelle setzen
-        dut.key_in.value = i + 1  # Schlüssel setzen, der mit dem ersten Eintrag übereinstimmt
-        dut.select_by_index.value = 0  # Read-Operation aktivieren
-        
-        await RisingEdge(tester.clk)
-        await ReadOnly()
-
-        assert tester.hit.value == 1, f"Expected hit signal to be 1 for select operation with matching index, but got {tester.hit.value}."
-        assert tester.value_out.value == (i + 1) * 2, f"Expected value_out {(i + 1) * 2} for select operation with matching index, but got {tester.value_out.value}."
+    for i, (hit, value_out) in enumerate(results):
+        assert hit == 1, f"Expected hit signal to be 1 for select operation with matching index, but got {hit}."
+        assert value_out == (i + 1) * 2, f"Expected value_out {(i + 1) * 2} for select operation with matching index, but got {value_out}."
 
 @cocotb.test()
 async def test_reading_cell_by_select_with_input_key_not_matching(dut):
     """Test: check if we can read the value of a cell by its key"""
 
     tester = MemoryBlockTester(dut)
-    
-    # Start clock
-    cocotb.start_soon(Clock(dut.clk, 10, unit="ns").start())
 
     # 1. Reset
     await tester.reset()
 
     # 2. Schreiben von mehreren Einträgen
-    num_entries = tester.dut.NUM_ENTRIES.value
-    for i in range(num_entries):
-        key = i + 1  # Schlüssel im Bereich der Adressierung
-        value = (i + 1) * 2  # Wert im Bereich der Wertbreite
-        await tester.write(i, key, value)
+    await tester.fill()
 
     # Lesen der Zelle über key
     dut.index_in.value = 0  # Index auf die erste Zelle setzen
     dut.key_in.value = 15  # Schlüssel setzen, der mit keinem Eintrag übereinstimmt
     dut.select_by_index.value = 0  # Read-Operation aktivieren
     
-    await RisingEdge(tester.clk)
+    await tester.clk.rising_edge
     await ReadOnly()
 
     assert tester.hit.value == 0, f"Expected hit signal to be 0 for select operation with non-matching index, but got {tester.hit.value}."
@@ -341,25 +329,18 @@ async def test_deleting_entry(dut):
     """Test: check if we can delete an entry and that it is properly deleted."""
 
     tester = MemoryBlockTester(dut)
-    
-    # Start clock
-    cocotb.start_soon(Clock(dut.clk, 10, unit="ns").start())
 
     # 1. Reset
     await tester.reset()
 
     # 2. Schreiben von mehreren Einträgen
-    num_entries = int(tester.dut.NUM_ENTRIES.value)
-    for i in range(num_entries):
-        key = i + 1  # Schlüssel im Bereich der Adressierung
-        value = (i + 1) * 2  # Wert im Bereich der Wertbreite
-        await tester.write(i, key, value)
+    num_entries = await tester.fill()
 
     # Löschen des Eintrags an Index 0
     tester.index_in.value = 1 << 0  # Index auf die erste Zelle setzen
     tester.delete_op.value = 1  # Delete-Operation aktivieren
     
-    await RisingEdge(tester.clk)
+    await tester.clk.rising_edge
     tester.delete_op.value = 0
 
     # Überprüfen, dass der Eintrag gelöscht wurde
@@ -375,34 +356,27 @@ async def test_deleting_all_entries(dut):
     """Test: check if we can delete all entries and that they are properly deleted."""
 
     tester = MemoryBlockTester(dut)
-    
-    # Start clock
-    cocotb.start_soon(Clock(dut.clk, 10, unit="ns").start())
 
     # 1. Reset
     await tester.reset()
 
     # 2. Schreiben von mehreren Einträgen
-    num_entries = int(tester.dut.NUM_ENTRIES.value)
-    for i in range(num_entries):
-        key = i + 1  # Schlüssel im Bereich der Adressierung
-        value = (i + 1) * 2  # Wert im Bereich der Wertbreite
-        await tester.write(i, key, value)
+    num_entries = await tester.fill()
 
     # Löschen aller Einträge
     for i in range(num_entries):
-        tester.index_in.value = 1 << i  # Index auf die Zelle setzen
+        tester.index_in.value = tester.idx_mask[i]  # Index auf die Zelle setzen
         tester.delete_op.value = 1  # Delete-Operation aktivieren
-        await RisingEdge(tester.clk)
+        await tester.clk.rising_edge
         tester.delete_op.value = 0
 
     # Überprüfen, dass alle Einträge gelöscht wurden
     assert await tester.get_used_entries() == 0, f"Expected 0 used entries after deleting all entries, but got {await tester.get_used_entries()}."
 
-    for i in range(num_entries):
-        value_after_delete = await tester.get_cell_value_by_index(i)
+    results = await tester.read_all_by_index(range(num_entries))
+    for i, (hit, value_after_delete) in enumerate(results):
         assert value_after_delete == 0, f"Expected value 0 in cell {i} after deletion, but got {hex(value_after_delete)}."
-        assert tester.hit.value == 0, f"Expected hit signal to be 0 after deletion of cell {i}, but got {tester.hit.value}."
+        assert hit == 0, f"Expected hit signal to be 0 after deletion of cell {i}, but got {hit}."
 
 
 @cocotb.test()
@@ -410,9 +384,6 @@ async def test_overwriting_entry(dut):
     """Test: check if we can overwrite an existing entry and that the new value is properly stored."""
 
     tester = MemoryBlockTester(dut)
-    
-    # Start clock
-    cocotb.start_soon(Clock(dut.clk, 10, unit="ns").start())
 
     # 1. Reset
     await tester.reset()
@@ -427,15 +398,10 @@ async def test_overwriting_entry(dut):
     new_value = 6
     await tester.write(0, new_key, new_value)
 
-    all_cells = await tester.get_all_cells()
-
-    print(f"Cells after overwriting: {all_cells}")
-
-    await ReadOnly()
     # Überprüfen, dass der Eintrag überschrieben wurde
     assert await tester.get_used_entries() == 1, f"Expected 1 used entry after overwriting, but got {await tester.get_used_entries()}."
 
-    await RisingEdge(tester.clk)
+    await tester.clk.rising_edge
     value_after_overwrite = await tester.get_cell_value_by_index(0)
     assert value_after_overwrite == new_value, f"Expected value {new_value} in cell after overwriting, but got {hex(value_after_overwrite)}."
     assert tester.hit.value == 1, f"Expected hit signal to be 1 after overwriting, but got {tester.hit.value}."
@@ -445,21 +411,17 @@ async def test_writing_until_full(dut):
     """Test: check if we can write entries until the memory block is full and that it correctly reflects the full state."""
 
     tester = MemoryBlockTester(dut)
-    
-    # Start clock
-    cocotb.start_soon(Clock(dut.clk, 10, unit="ns").start())
 
     # 1. Reset
     await tester.reset()
 
     # 2. Schreiben von Einträgen bis zum Maximum
-    num_entries = int(tester.dut.NUM_ENTRIES.value)
+    num_entries = tester.num_entries
     for i in range(num_entries):
         key = i + 1  # Schlüssel im Bereich der Adressierung
         value = (i + 1) * 2  # Wert im Bereich der Wertbreite
         await tester.write(i, key, value)
 
-        await ReadOnly()  
         used_entries = await tester.get_used_entries()
         assert used_entries == i + 1, f"Expected {i + 1} used entries after writing {i + 1} entries, but got {used_entries}."
 
@@ -468,47 +430,56 @@ async def test_persistence_of_entries(dut):
     """Test: check if entries persist correctly across multiple write and delete operations."""
 
     tester = MemoryBlockTester(dut)
-    
-    # Start clock
-    cocotb.start_soon(Clock(dut.clk, 10, unit="ns").start())
 
     await tester.reset()
 
     # 2. Schreiben von mehreren Einträgen
-    num_entries = int(tester.dut.NUM_ENTRIES.value)
-    for i in range(num_entries):
-        key = i + 1  # Schlüssel im Bereich der Adressierung
-        value = (i + 1) * 2  # Wert im Bereich der Wertbreite
-        await tester.write(i, key, value)
+    num_entries = await tester.fill()
 
     # Löschen eines Eintrags und Überprüfen der Persistenz der anderen Einträge
     tester.index_in.value = 1 << 0  # Index auf die erste Zelle setzen
     tester.delete_op.value = 1  # Delete-Operation aktivieren
-    await RisingEdge(tester.clk)
+    await tester.clk.rising_edge
     tester.delete_op.value = 0  # Delete-Operation beenden
 
     assert await tester.get_used_entries() == num_entries - 1, f"Expected {num_entries - 1} used entries after deletion, but got {await tester.get_used_entries()}."
 
     # simulate multiple clock cycles
     for _ in range(5):
-        await RisingEdge(tester.clk)
+        await tester.clk.rising_edge
 
-    for i in range(1, num_entries):  # Überprüfen der verbleibenden Einträge (Index 1 bis num_entries-1)
-        value_after_delete = await tester.get_cell_value_by_index(i)
+    # Überprüfen der verbleibenden Einträge (Index 1 bis num_entries-1)
+    results = await tester.read_all_by_index(range(1, num_entries))
+    for i, (hit, value_after_delete) in enumerate(results, start=1):
         expected_value = (i + 1) * 2
         assert value_after_delete == expected_value, f"Expected value {expected_value} in cell {i} after deletion of cell 0, but got {hex(value_after_delete)}."
-        assert tester.hit.value == 1, f"Expected hit signal to be 1 for cell {i} after deletion of cell 0, but got {tester.hit.value}."
-
-
-def test_memory_block_runner():
-    sim = os.getenv("SIM", "icarus")
+        assert hit == 1, f"Expected hit signal to be 1 for cell {i} after deletion of cell 0, but got {hit}."
+
+
+# Einzeln parametrisiert für pytest -n auto
+MEMORY_BLOCK_TESTS = (
+    "test_reset",
+    "test_writing_memory_block",
+    "test_used_entries",
+    "test_reading_cell_by_key",
+    "test_reading_cell_by_index",
+    "test_reading_cell_by_select_with_input_key_matching",
+    "test_reading_cell_by_select_with_input_key_not_matching",
+    "test_deleting_entry",
+    "test_deleting_all_entries",
+    "test_overwriting_entry",
+    "test_writing_until_full",
+    "test_persistence_of_entries",
+)
+
+
+@functools.cache
+def _build_memory_block():
+    """Baut memory_block_tb einmal pro Prozess und liefert (runner, build_dir, waves)."""
+    sim = os.getenv("SIM", "verilator")
 
     proj_path = Path(__file__).resolve().parent
 
-    sources = [proj_path / ".." / "src" / "memory_block.sv"]
-
-    runner = get_runner(sim)
-
     parameters = {
         "NUM_ENTRIES": 4, 
         "KEY_WIDTH": 4, 
@@ -519,24 +490,45 @@ def test_memory_block_runner():
         proj_path / ".." / ".." / "redis_cache" / "src" / "cache_cfg_pkg.sv",
         proj_path / ".." / "src" / "memory_block.sv",
         proj_path / ".." / "src" / "memory_cell.sv",
-        proj_path / ".." / "src" / "memory_dynamic_registerarray.sv"
+        proj_path / ".." / "src" / "memory_dynamic_registerarray.sv",
+        proj_path / "memory_block_tb.sv"  # Wrapper mit Clock-Generator
     ]
 
-    runner.build(
-        sources=sources,
-        hdl_toplevel="memory_block",
-        parameters=parameters,
-        always=True,
-        waves=True,
-        timescale=("1ns", "1ps"),
+    waves = os.getenv("WAVES", "0") == "1"
+
+    build_args = []
+    if sim == "verilator":
+        build_args = ["--timing"]  # für den Clock-Generator (always #5) im Wrapper
+        build_args += ["-Wno-fatal", "-Wno-lint", "-Wno-style"]
+        build_args += ["--noassert", "-O3", "--x-assign", "fast", "--x-initial", "fast"]
+        if waves:
+            build_args += ["--trace-fst"]
+
+    runner, build_dir = build_once(
+        sim, proj_path / "sim_build", "memory_block", sources, parameters, build_args, waves,
+        hdl_toplevel="memory_block_tb", timescale=("1ns", "1ps"),
     )
 
+    return runner, build_dir, waves
+
+
+@pytest.mark.parametrize("test_name", MEMORY_BLOCK_TESTS)
+def test_memory_block_runner(test_name):
+    runner, build_dir, waves = _build_memory_block()
+
+    test_dir = build_dir / test_name
+    test_dir.mkdir(exist_ok=True)
 
     runner.test(
-        hdl_toplevel="memory_block", 
+        hdl_toplevel="memory_block_tb", 
+        hdl_toplevel_lang="verilog",  # ohne build() kennt der Runner die Quellen nicht
         test_module="test_memory_block", 
-        waves=True
+        test_filter=rf"\b{test_name}$",
+        build_dir=build_dir,
+        test_dir=test_dir,
+        waves=waves
     )
 
 if __name__ == "__main__":
-    test_memory_block_runner()
+    for test_name in MEMORY_BLOCK_TESTS:
+        test_memory_block_runner(test_name)
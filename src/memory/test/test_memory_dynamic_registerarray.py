@@ -1,11 +1,13 @@
+import functools
 import os
 from pathlib import Path
 
 import cocotb
+import pytest
 from cocotb.clock import Clock
-from cocotb.triggers import FallingEdge, RisingEdge
-from cocotb_tools.runner import get_runner
-from cocotb.triggers import ReadOnly
+from cocotb.triggers import FallingEdge, RisingEdge, Timer
+
+from cached_build import build_once
 
 
 class RegisterArrayTester:
@@ -21,9 +23,10 @@ class RegisterArrayTester:
         self.dut.write_op.value = 0
         self.dut.data_in.value = 0
         
-        await FallingEdge(self.clk)
+        # Reset-Puls über einen Timer (1,5 Perioden) statt zwei Flanken abzuwarten
+        await Timer(15, unit="ns")
         self.dut.rst_n.value = 1  # Reset lösen
-        await FallingEdge(self.clk)
+        await RisingEdge(self.clk)
 
     async def write(self, data: int):
         """Schreibt Daten in das Register (ohne Output zu aktivieren)."""
@@ -31,25 +34,40 @@ class RegisterArrayTester:
         self.dut.write_op.value = 1
         self.dut.data_in.value = data
         
-        await FallingEdge(self.clk)
+        await FallingEdge(self.clk)  # Register übernimmt an der fallenden Flanke
         self.dut.write_op.value = 0  # Write beenden
 
+        # Eine halbe Periode später ist data_out stabil und kann ohne ReadOnly gelesen werden
+        await RisingEdge(self.clk)
+
+    async def wait_capture(self):
+        """Wartet auf die Übernahme an der fallenden Flanke und tastet wie write() an der folgenden steigenden ab."""
+        await FallingEdge(self.clk)
+        await RisingEdge(self.clk)
+
+
+async def _setup(dut):
+    """Gemeinsamer Testaufbau: Tester anlegen, Clock starten, Reset anlegen.
+
+    Die Clock wird pro Test gestartet, da cocotb alle Tasks am Testende beendet.
+    """
+    tester = RegisterArrayTester(dut)
+    cocotb.start_soon(Clock(dut.clk, 10, unit="ns").start())
+    await tester.reset()
+    return tester
+
 
 @cocotb.test()
 async def test_reset(dut):
     """Test: Reset-Verhalten überprüfen."""
     
-    tester = RegisterArrayTester(dut)
-    
-    # Start clock
-    cocotb.start_soon(Clock(dut.clk, 10, unit="ns").start())
+    tester = await _setup(dut)
 
     await tester.write(0xFF)  # Vor dem Reset einen Wert schreiben, um sicherzustellen, dass Reset funktioniert
 
     # 1. Reset
     await tester.reset()
 
-    await ReadOnly() 
     assert dut.data_out.value == 0, \
         f"Reset failed! Expected 0, got {hex(dut.data_out.value)}"
 
@@ -58,21 +76,14 @@ async def test_reset(dut):
 async def test_write_simple(dut):
     """Test: Nur Schreiben und überprüfen."""
     
-    tester = RegisterArrayTester(dut)
-    
-    # Start clock
-    cocotb.start_soon(Clock(dut.clk, 10, unit="ns").start())
-
-    # 1. Reset
-    await tester.reset()
+    # 1. Clock + Reset
+    tester = await _setup(dut)
 
     # 2. Schreiben
     test_value = 0x55
     dut._log.info(f"Writing value: {hex(test_value)}...")
     await tester.write(test_value)
 
-    await ReadOnly()
-
     assert dut.data_out.value == test_value, \
         f"Write failed! Expected {hex(test_value)}, got {hex(dut.data_out.value)}"
 
@@ -84,20 +95,14 @@ async def test_write_simple(dut):
 async def test_write_overwrite(dut):
     """Test: Überschreiben von Daten."""
     
-    tester = RegisterArrayTester(dut)
-    
-    # Start clock
-    cocotb.start_soon(Clock(dut.clk, 10, unit="ns").start())
-
-    # 1. Reset
-    await tester.reset()
+    # 1. Clock + Reset
+    tester = await _setup(dut)
 
     # 2. Erstes Schreiben
     first_value = 0xAA
     dut._log.info(f"Writing first value: {hex(first_value)}...")
     await tester.write(first_value)
 
-    await ReadOnly() 
     assert dut.data_out.value == first_value, \
         f"First write failed! Expected {hex(first_value)}, got {hex(dut.data_out.value)}"
     
@@ -105,7 +110,6 @@ async def test_write_overwrite(dut):
     second_value = 0x33
     dut._log.info(f"Overwriting with second value: {hex(second_value)}...")
     await tester.write(second_value)
-    await ReadOnly()
     assert dut.data_out.value == second_value, \
         f"Overwrite failed! Expected {hex(second_value)}, got {hex(dut.data_out.value)}"
 
@@ -115,13 +119,8 @@ async def test_write_overwrite(dut):
 async def test_data_in_without_write(dut):
     """Test: Daten an data_in anlegen, aber write_op nicht aktivieren."""
     
-    tester = RegisterArrayTester(dut)
-    
-    # Start clock
-    cocotb.start_soon(Clock(dut.clk, 10, unit="ns").start())
-
-    # 1. Reset
-    await tester.reset()
+    # 1. Clock + Reset
+    tester = await _setup(dut)
 
     # 2. Daten anlegen ohne write_op zu aktivieren
     test_value = 0x77
@@ -130,9 +129,8 @@ async def test_data_in_without_write(dut):
     dut.data_in.value = test_value
     dut.write_op.value = 0  # write_op nicht aktivieren
 
-    await FallingEdge(tester.clk)  # Auf die nächste steigende Flanke warten
+    await tester.wait_capture()
 
-    await ReadOnly() 
     assert dut.data_out.value == 0, \
         f"Expected 0 after setting data_in without write_op, got {hex(dut.data_out.value)}"
 
@@ -141,20 +139,14 @@ async def test_data_in_without_write(dut):
 async def test_multiple_writes(dut):
     """Test: Mehrere Schreibvorgänge hintereinander."""
     
-    tester = RegisterArrayTester(dut)
-    
-    # Start clock
-    cocotb.start_soon(Clock(dut.clk, 10, unit="ns").start())
-
-    # 1. Reset
-    await tester.reset()
+    # 1. Clock + Reset
+    tester = await _setup(dut)
 
     # 2. Mehrere Werte schreiben
     test_values = [0x10, 0x20, 0x30, 0x40]
     for val in test_values:
         dut._log.info(f"Writing value: {hex(val)}...")
         await tester.write(val)
-        await ReadOnly() 
         assert dut.data_out.value == val, \
             f"Write failed! Expected {hex(val)}, got {hex(dut.data_out.value)}"
     dut._log.info("✓ Multiple writes verify successful")
@@ -163,13 +155,8 @@ async def test_multiple_writes(dut):
 async def test_reset_during_write(dut):
     """Test: Reset während eines Schreibvorgangs."""
     
-    tester = RegisterArrayTester(dut)
-    
-    # Start clock
-    cocotb.start_soon(Clock(dut.clk, 10, unit="ns").start())
-
-    # 1. Reset
-    await tester.reset()
+    # 1. Clock + Reset
+    tester = await _setup(dut)
 
     # 2. Schreiben und gleichzeitig Reset auslösen
     test_value = 0xAB
@@ -179,9 +166,8 @@ async def test_reset_during_write(dut):
     dut.write_op.value = 1  # write_op aktivieren
     dut.rst_n.value = 0  # Reset aktivieren
 
-    await FallingEdge(tester.clk)  # Auf die nächste fallende Flanke warten
+    await tester.wait_capture()
 
-    await ReadOnly() 
     assert dut.data_out.value == 0, \
         f"Expected 0 after reset during write, got {hex(dut.data_out.value)}"
 
@@ -190,13 +176,8 @@ async def test_reset_during_write(dut):
 async def test_data_retention_after_write(dut):
     """Test: Daten werden nach einem Schreibvorgang erhalten."""
     
-    tester = RegisterArrayTester(dut)
-    
-    # Start clock
-    cocotb.start_soon(Clock(dut.clk, 10, unit="ns").start())
-
-    # 1. Reset
-    await tester.reset()
+    # 1. Clock + Reset
+    tester = await _setup(dut)
 
     # 2. Schreiben
     test_value = 0xCD
@@ -204,10 +185,9 @@ async def test_data_retention_after_write(dut):
     await tester.write(test_value)
 
     # 3. Einige Takte warten, um sicherzustellen, dass Daten erhalten bleiben
-    for _ in range(5):
-        await RisingEdge(tester.clk)
+    # Ein einziger Timer über 5 Perioden (10 ns) statt 5 einzelner Flanken
+    await Timer(50, unit="ns")
 
-    await ReadOnly() 
     assert dut.data_out.value == test_value, \
         f"Data retention failed! Expected {hex(test_value)}, got {hex(dut.data_out.value)}"
 
@@ -215,20 +195,14 @@ async def test_data_retention_after_write(dut):
 async def test_write_zero_to_filled_register(dut):
     """Test: Schreiben von 0 in ein bereits gefülltes Register."""
     
-    tester = RegisterArrayTester(dut)
-    
-    # Start clock
-    cocotb.start_soon(Clock(dut.clk, 10, unit="ns").start())
-
-    # 1. Reset
-    await tester.reset()
+    # 1. Clock + Reset
+    tester = await _setup(dut)
 
     # 2. Erstes Schreiben
     first_value = 0xEF
     dut._log.info(f"Writing first value: {hex(first_value)}...")
     await tester.write(first_value)
 
-    await ReadOnly() 
     assert dut.data_out.value == first_value, \
         f"First write failed! Expected {hex(first_value)}, got {hex(dut.data_out.value)}"
 
@@ -236,37 +210,68 @@ async def test_write_zero_to_filled_register(dut):
     second_value = 0x00
     dut._log.info(f"Writing second value (0) to filled register...")
     await tester.write(second_value)
-    await ReadOnly()
     assert dut.data_out.value == second_value, \
         f"Writing 0 failed! Expected {hex(second_value)}, got {hex(dut.data_out.value)}"
 
 
-def test_register_runner():
-    sim = os.getenv("SIM", "icarus")
+# Einzeln parametrisiert für pytest -n auto
+REGISTER_ARRAY_TESTS = (
+    "test_reset",
+    "test_write_simple",
+    "test_write_overwrite",
+    "test_data_in_without_write",
+    "test_multiple_writes",
+    "test_reset_during_write",
+    "test_data_retention_after_write",
+    "test_write_zero_to_filled_register",
+)
+
+
+@functools.cache
+def _build_register_array():
+    """Baut dynamic_register_array einmal pro Prozess und liefert (runner, build_dir, waves)."""
+    sim = os.getenv("SIM", "verilator")
     proj_path = Path(__file__).resolve().parent
     
     # Deine Verilog Datei
     sources = [proj_path / ".." / "src" / "memory_dynamic_registerarray.sv"]
 
-    runner = get_runner(sim)
+    waves = os.getenv("WAVES", "0") == "1"
     
     # WICHTIG: Parameter für die Breite setzen (z.B. 8 Bit)
     parameters = {"LENGTH": 8}
 
-    runner.build(
-        sources=sources,
-        hdl_toplevel="dynamic_register_array",
-        parameters=parameters,
-        always=True, 
-        waves=True,
-        timescale=("1ns", "1ps")
+    build_args = []
+    if sim == "verilator":
+        build_args = ["-Wno-fatal", "-Wno-lint", "-Wno-style"]
+        build_args += ["--noassert", "-O3", "--x-assign", "fast", "--x-initial", "fast"]
+
+    runner, build_dir = build_once(
+        sim, proj_path / "sim_build", "dynamic_register_array", sources, parameters, build_args, waves,
+        hdl_toplevel="dynamic_register_array", timescale=("1ns", "1ps"),
     )
 
+    return runner, build_dir, waves
+
+
+@pytest.mark.parametrize("test_name", REGISTER_ARRAY_TESTS)
+def test_register_runner(test_name):
+    runner, build_dir, waves = _build_register_array()
+
+    # Eigenes Test-Verzeichnis pro Test, damit parallele Worker ihre results.xml nicht überschreiben
+    test_dir = build_dir / test_name
+    test_dir.mkdir(exist_ok=True)
+
     runner.test(
         hdl_toplevel="dynamic_register_array", 
+        hdl_toplevel_lang="verilog",  # ohne build() kennt der Runner die Quellen nicht
         test_module="test_memory_dynamic_registerarray", # Name dieser Datei
-        waves=True
+        test_filter=rf"\b{test_name}$",
+        build_dir=build_dir,
+        test_dir=test_dir,
+        waves=waves
     )
 
 if __name__ == "__main__":
-    test_register_runner()
\ No newline at end of file
+    for test_name in REGISTER_ARRAY_TESTS:
+        test_register_runner(test_name)
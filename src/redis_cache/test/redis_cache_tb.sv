@@ -0,0 +1,36 @@
+/**
+ * Redis Cache Testbench Wrapper
+ *
+ * Thin top level for the cocotb tests of redis_cache.
+ * Generates the clock in HDL (10 ns period) so cocotb only has to
+ * await the edges instead of toggling clk from Python.
+ */
+
+module redis_cache_tb #(
+    parameter int unsigned NUM_ENTRIES = cache_cfg_pkg::NUM_ENTRIES,
+    parameter int unsigned KEY_WIDTH = cache_cfg_pkg::KEY_WIDTH,
+    parameter int unsigned VALUE_WIDTH = cache_cfg_pkg::VALUE_WIDTH
+)(
+    input logic rst_n,
+
+    // OBI Interface
+    input if_types_pkg::obi_req_t obi_req_i,
+    output if_types_pkg::obi_rsp_t obi_resp_o
+);
+
+    logic clk = 1'b0;
+    always #5 clk = ~clk;
+
+    redis_cache #(
+        .NUM_ENTRIES(NUM_ENTRIES),
+        .KEY_WIDTH(KEY_WIDTH),
+        .VALUE_WIDTH(VALUE_WIDTH)
+    ) u_dut (
+        .clk(clk),
+        .rst_n(rst_n),
+
+        .obi_req_i(obi_req_i),
+        .obi_resp_o(obi_resp_o)
+    );
+
+endmodule